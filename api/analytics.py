@@ -0,0 +1,230 @@
+# api/analytics.py
+# 📊 Columnar snapshots of cosmoweb3db collections for offline analytics
+# - Incremental export: only records added since the last export, across restarts
+# - One directory per batch, one .npy file per field, JSON manifest
+# - Query helpers memory-map the files: no calls into the live service
+
+import json
+import os
+import re
+from datetime import datetime, timezone
+
+import numpy as np
+
+MANIFEST = "manifest.json"
+BATCH_SIZE = 50000
+
+# Field kinds and their on-disk dtypes / missing values
+NUMBER = "number"      # float64, NaN when missing
+DATETIME = "datetime"  # datetime64[us] (UTC), NaT when missing
+STRING = "string"      # fixed-width unicode, "" when missing
+
+MAX_EXACT_INT = 2 ** 53  # Wider integers (e.g. wei amounts) lose digits as float64
+
+def _parse_datetime(value):
+    if not isinstance(value, str) or len(value) < 10 or "-" not in value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+def _is_number(value):
+    """Numbers float64 holds exactly enough: bools and integers wider than 2**53 are not"""
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return False
+    return isinstance(value, float) or abs(value) <= MAX_EXACT_INT
+
+def _infer_kind(values):
+    present = [v for v in values if v is not None]
+    if present and all(_is_number(v) for v in present):
+        return NUMBER
+    if present and all(_parse_datetime(v) is not None for v in present):
+        return DATETIME
+    return STRING
+
+def _to_string(value):
+    if value is None:
+        return ""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, separators=(",", ":"), default=str)
+    return str(value)
+
+def _to_array(values, kind):
+    if kind == NUMBER:
+        return np.array([float(v) if _is_number(v) else np.nan for v in values], dtype="float64")
+    if kind == DATETIME:
+        parsed = [_parse_datetime(v) for v in values]
+        return np.array([p if p is not None else "NaT" for p in parsed], dtype="datetime64[us]")
+    strings = [_to_string(v) for v in values]
+    width = max((len(s) for s in strings), default=1) or 1
+    return np.array(strings, dtype=f"<U{width}")
+
+def load_manifest(out_dir):
+    path = os.path.join(out_dir, MANIFEST)
+    if not os.path.exists(path):
+        return {"collections": {}}
+    with open(path, "r") as f:
+        return json.load(f)
+
+def _save_manifest(out_dir, manifest):
+    path = os.path.join(out_dir, MANIFEST)
+    with open(path + ".tmp", "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+def export_collection(records, collection, out_dir, epoch, batch_size=BATCH_SIZE):
+    """
+    Append the records not yet exported to the columnar snapshot of `collection`.
+
+    `records` is append-only within one `epoch` (e.g. one per process: the
+    live collections are in memory and start empty after a restart). The
+    manifest stores the epoch and a cursor into `records`; a new epoch, or a
+    list shorter than the cursor, restarts the cursor at 0. Parts are named by
+    their global row offset, so rows from different epochs never collide.
+    Returns the number of rows written.
+    """
+    manifest = load_manifest(out_dir)
+    meta = manifest["collections"].setdefault(collection, {"rows": 0, "schema": {}, "parts": []})
+    if meta.get("epoch") != epoch or len(records) < meta.get("cursor", 0):
+        meta["epoch"] = epoch
+        meta["cursor"] = 0
+    total = len(records)
+    written = 0
+
+    for offset in range(meta["cursor"], total, batch_size):
+        batch = [r if isinstance(r, dict) else {} for r in records[offset:offset + batch_size]]
+        start = meta["rows"]
+        part = f"{collection}/part-{start:012d}"
+        part_dir = os.path.join(out_dir, part)
+        os.makedirs(part_dir, exist_ok=True)
+
+        fields = {}
+        names = sorted({k for r in batch for k in r})
+        for name in names:
+            values = [r.get(name) for r in batch]
+            # A field's kind is fixed by the first batch that contains it
+            if name not in meta["schema"]:
+                meta["schema"][name] = _infer_kind(values)
+            kind = meta["schema"][name]
+            filename = re.sub(r"[^A-Za-z0-9_.-]", "_", name) + ".npy"
+            np.save(os.path.join(part_dir, filename), _to_array(values, kind))
+            fields[name] = filename
+
+        meta["parts"].append({"dir": part, "start": start, "rows": len(batch), "epoch": epoch, "fields": fields})
+        meta["rows"] = start + len(batch)
+        meta["cursor"] = offset + len(batch)
+        meta["exported_at"] = datetime.now().isoformat()
+        # Manifest last: a crash mid-batch leaves an orphan part that the next run overwrites
+        _save_manifest(out_dir, manifest)
+        written += len(batch)
+
+    return written
+
+def _window(spec):
+    match = re.fullmatch(r"(\d+)\s*([smhDW])", spec)
+    if not match:
+        raise ValueError(f"Invalid window: {spec} (use e.g. 15m, 1h, 1D)")
+    return np.timedelta64(int(match.group(1)), match.group(2))
+
+class Snapshot:
+    """Read-only view over an export directory. Columns are memory-mapped per part."""
+
+    def __init__(self, out_dir):
+        self.out_dir = out_dir
+        self.manifest = load_manifest(out_dir)
+
+    def collections(self):
+        return list(self.manifest["collections"])
+
+    def rows(self, collection):
+        return self.manifest["collections"][collection]["rows"]
+
+    def _parts(self, collection):
+        return self.manifest["collections"][collection]["parts"]
+
+    def _require_number(self, collection, field):
+        kind = self.manifest["collections"][collection]["schema"].get(field)
+        if kind != NUMBER:
+            raise ValueError(f"{collection}.{field} is not numeric (kind: {kind})")
+
+    def _missing(self, kind, n):
+        if kind == NUMBER:
+            return np.full(n, np.nan)
+        if kind == DATETIME:
+            return np.full(n, np.datetime64("NaT"), dtype="datetime64[us]")
+        return np.full(n, "", dtype="<U1")
+
+    def _part_column(self, collection, part, field):
+        filename = part["fields"].get(field)
+        if filename is None:
+            kind = self.manifest["collections"][collection]["schema"].get(field, STRING)
+            return self._missing(kind, part["rows"])
+        return np.load(os.path.join(self.out_dir, part["dir"], filename), mmap_mode="r")
+
+    def iter_columns(self, collection, *fields):
+        """Yield one tuple of memory-mapped arrays per part"""
+        for part in self._parts(collection):
+            yield tuple(self._part_column(collection, part, f) for f in fields)
+
+    def column(self, collection, field):
+        """Whole column as one array (copies the parts into memory)"""
+        parts = [cols[0] for cols in self.iter_columns(collection, field)]
+        return np.concatenate(parts) if parts else np.array([])
+
+    def group_by(self, collection, by, value):
+        """{key: {"count", "sum", "mean", "min", "max"}} of a numeric field, NaNs skipped"""
+        self._require_number(collection, value)
+        acc = {}
+        for keys, values in self.iter_columns(collection, by, value):
+            mask = ~np.isnan(values)
+            keys, values = keys[mask], values[mask]
+            uniq, inverse = np.unique(keys, return_inverse=True)
+            counts = np.bincount(inverse, minlength=len(uniq))
+            sums = np.bincount(inverse, weights=values, minlength=len(uniq))
+            mins = np.full(len(uniq), np.inf)
+            maxs = np.full(len(uniq), -np.inf)
+            np.minimum.at(mins, inverse, values)
+            np.maximum.at(maxs, inverse, values)
+            for i, key in enumerate(uniq.tolist()):
+                entry = acc.setdefault(key, {"count": 0, "sum": 0.0, "min": np.inf, "max": -np.inf})
+                entry["count"] += int(counts[i])
+                entry["sum"] += float(sums[i])
+                entry["min"] = min(entry["min"], float(mins[i]))
+                entry["max"] = max(entry["max"], float(maxs[i]))
+        for entry in acc.values():
+            entry["mean"] = entry["sum"] / entry["count"]
+        return acc
+
+    def time_windows(self, collection, value, window="1h", time_field="timestamp", start=None, end=None):
+        """Count and sum of a numeric field per fixed time window, in window order"""
+        self._require_number(collection, value)
+        step = _window(window).astype("timedelta64[us]").astype("int64")
+        lo = np.datetime64(start, "us") if start else None
+        hi = np.datetime64(end, "us") if end else None
+        acc = {}
+        for times, values in self.iter_columns(collection, time_field, value):
+            mask = ~np.isnat(times) & ~np.isnan(values)
+            if lo is not None:
+                mask &= times >= lo
+            if hi is not None:
+                mask &= times < hi
+            buckets = times[mask].astype("int64") // step
+            uniq, inverse = np.unique(buckets, return_inverse=True)
+            counts = np.bincount(inverse, minlength=len(uniq))
+            sums = np.bincount(inverse, weights=values[mask], minlength=len(uniq))
+            for i, bucket in enumerate(uniq.tolist()):
+                entry = acc.setdefault(bucket, [0, 0.0])
+                entry[0] += int(counts[i])
+                entry[1] += float(sums[i])
+        return [
+            {
+                "window_start": str(np.datetime64(int(bucket * step), "us")),
+                "count": count,
+                "sum": total
+            }
+            for bucket, (count, total) in sorted(acc.items())
+        ]
@@ -0,0 +1,99 @@
+# api/applog.py
+# 📝 Non-blocking, structured logging for the api/ services
+# - Request path only enqueues records (QueueHandler)
+# - A QueueListener thread does JSON encoding and disk I/O
+# - One JSON object per line; "level" keeps ERROR greppable
+# - Sampling for high-volume messages: logger.info(..., extra={"sample": 0.01})
+
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+
+# Default keep-rate for messages logged with extra={"sample": SAMPLE_RATE}
+SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "0.1"))
+
+_listener = None
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage()
+        }
+        if getattr(record, "sample", None) is not None:
+            entry["sample"] = record.sample  # Keep-rate: scale counts by 1/sample
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+class SamplingFilter(logging.Filter):
+    """Keeps records tagged with extra={"sample": rate} with that probability. WARNING and above always pass."""
+
+    def filter(self, record):
+        rate = getattr(record, "sample", None)
+        if rate is None or record.levelno >= logging.WARNING:
+            return True
+        return random.random() < rate
+
+class SnapshotQueueHandler(logging.handlers.QueueHandler):
+    """
+    Renders msg % args on the calling thread, so mutable arguments are logged
+    as they were at the call. Only records that passed the level and sampling
+    filters get here; JSON encoding and I/O stay on the listener thread.
+    """
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+def setup_logging(level=logging.INFO, filename=None):
+    """Route all logging through a queue to a JSON-lines handler on filename (stderr if None). Idempotent."""
+    global _listener
+    if _listener is not None:
+        return
+
+    fallback_error = None
+    target = None
+    if filename:
+        try:
+            target = logging.FileHandler(filename)
+        except OSError as e:
+            fallback_error = e
+    if target is None:
+        target = logging.StreamHandler(sys.stderr)
+    target.setFormatter(JsonFormatter())
+
+    log_queue = queue.SimpleQueue()
+    handler = SnapshotQueueHandler(log_queue)
+    handler.addFilter(SamplingFilter())
+
+    root = logging.getLogger()
+    for old in root.handlers[:]:
+        root.removeHandler(old)
+    root.addHandler(handler)
+    root.setLevel(level)
+
+    _listener = logging.handlers.QueueListener(log_queue, target, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+
+    if fallback_error is not None:
+        logging.getLogger(__name__).warning("Cannot open log file %s, logging to stderr: %s", filename, fallback_error)
+
+def stop_logging():
+    """Flush queued records and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
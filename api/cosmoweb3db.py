@@ -11,16 +11,26 @@ import json
 import logging
 from datetime import datetime
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import Response
 from pydantic import BaseModel
 from web3 import Web3
-import aiohttp
 import torch
 import torch.nn as nn
 from torch.distributions import Categorical
 import asyncio
+try:
+    import orjson  # Optional fast encoder
+except ImportError:
+    orjson = None
+from scheduler import Scheduler, Job, Step, FIXED_DELAY
+from applog import setup_logging, SAMPLE_RATE
+from analytics import export_collection
+from paymaster import PaymasterMonitor
+import tracing
+from tracing import span
 
 app = FastAPI()
-logging.basicConfig(level=logging.INFO)
+setup_logging(logging.INFO)
 logger = logging.getLogger(__name__)
 
 # 🌍 BSC Network Config
@@ -41,7 +51,7 @@ USDT_ABI = [
     {"constant": True, "inputs": [{"name": "_owner", "type": "address"}], "name": "balanceOf", "outputs": [{"name": "balance", "type": "uint256"}], "type": "function"}
 ]
 
-usdt_contract = web3.eth.contract(address=USDT_CONTRACT_ADDRESS, abi=USDT_ABI)
+usdt_contract = web3.eth.contract(address=Web3.to_checksum_address(USDT_CONTRACT_ADDRESS), abi=USDT_ABI)
 
 # 🧠 AI Gas Optimizer (No external deps)
 class GasOptimizer:
@@ -66,56 +76,354 @@ gas_optimizer = GasOptimizer()
 # 🔄 Self-Healing Paymaster Check
 PAYMASTER_URL = os.getenv("PAYMASTER_URL", "https://paymaster.example.com/health")
 BACKUP_PAYMASTER = "https://backup.paymaster.example.com/health"
+PAYMASTER_PROBE_SECONDS = int(os.getenv("PAYMASTER_PROBE_SECONDS", "15"))
+PAYMASTER_MAX_STALENESS = int(os.getenv("PAYMASTER_MAX_STALENESS", "60"))
+
+# Probed in the background (see the "paymaster-health" job); requests only read the cache
+paymaster_monitor = PaymasterMonitor(
+    {"primary": PAYMASTER_URL, "backup": BACKUP_PAYMASTER},
+    timeout=5, max_staleness=PAYMASTER_MAX_STALENESS
+)
 
 async def check_paymaster():
-    async with aiohttp.ClientSession() as session:
-        for url in [PAYMASTER_URL, BACKUP_PAYMASTER]:
-            try:
-                async with session.get(url, timeout=5) as resp:
-                    if resp.status == 200:
-                        return True
-            except:
-                continue
-        return False
+    return paymaster_monitor.healthy()
+
+async def probe_paymasters(ctx):
+    return await paymaster_monitor.probe_all()
+
+# ⚡ Fast JSON encoding
+# Responses are returned as pre-rendered bytes, which skips FastAPI's
+# jsonable_encoder pass over plain dict/list payloads.
+def dumps(obj) -> bytes:
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, default=str)
+        except (orjson.JSONEncodeError, TypeError):
+            pass  # e.g. integers wider than 64 bits
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False, default=str).encode("utf-8")
+
+class FastJSONResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        with span("encode"):
+            return dumps(content)
 
 # 💾 In-Memory "Database" (Render-safe)
+# Records are immutable once inserted, so each one is encoded at most once:
+# _encoded[collection][i] caches the JSON bytes of _db[collection][i].
 _db = {
     "payouts": [],
     "opportunities": [],
     "logs": []
 }
+_encoded = {}
 
 async def insert_data(collection: str, data: dict):
     if collection not in _db:
         _db[collection] = []
     _db[collection].append(data)
-    logger.info(f"💾 Inserted into {collection}: {data}")
+    logger.info("💾 Inserted into %s", collection, extra={"sample": SAMPLE_RATE})
+    logger.debug("💾 Inserted into %s: %s", collection, data)
 
-async def find_data(collection: str, query: dict = None):
-    items = _db.get(collection, [])
-    if not query:
-        return items
-    # Simple filter (for demo)
-    return [item for item in items if all(item.get(k) == v for k, v in query.items())]
+def _matches(item, query):
+    return all(item.get(k) == v for k, v in query.items())
 
-# 🤖 Autonomous Revenue Engine
-async def run_autonomous_payouts():
-    while True:
+async def find_encoded(collection: str, query: dict = None) -> bytes:
+    """Matching records of a collection as JSON array bytes, built from cached records"""
+    if collection not in _db:
+        return b"[]"
+    items = _db[collection]
+    cache = _encoded.setdefault(collection, [])
+    if len(cache) < len(items):
+        cache.extend([None] * (len(items) - len(cache)))
+    parts = []
+    for i, item in enumerate(items):
+        if query and not _matches(item, query):
+            continue
+        if cache[i] is None:
+            cache[i] = dumps(item)
+        parts.append(cache[i])
+    return b"[" + b",".join(parts) + b"]"
+
+# 📒 On-chain USDT Transfer Indexer
+# Follows Transfer(from, to, value) logs touching WALLET_ADDRESS so wallet
+# history and balance come from a local index instead of balanceOf polling.
+TRANSFER_TOPIC = "0xddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef"
+INDEXER_STATE_FILE = os.getenv("INDEXER_STATE_FILE", "/tmp/cosmoweb3db_usdt_index.json")
+INDEXER_START_BLOCK = os.getenv("INDEXER_START_BLOCK")  # Defaults to chain head on first run
+INDEXER_REORG_DEPTH = int(os.getenv("INDEXER_REORG_DEPTH", "15"))
+INDEXER_POLL_SECONDS = int(os.getenv("INDEXER_POLL_SECONDS", "15"))
+
+class TransferIndexer:
+    def __init__(self, w3, token, wallet, state_file, start_block=None, reorg_depth=15,
+                 min_chunk=10, max_chunk=5000, target_logs=500):
+        self.w3 = w3
+        self.token = Web3.to_checksum_address(token)
+        self.wallet = Web3.to_checksum_address(wallet)
+        self.wallet_topic = "0x" + "0" * 24 + self.wallet[2:].lower()
+        self.state_file = state_file
+        self.start_block = start_block
+        self.reorg_depth = reorg_depth
+        self.min_chunk = min_chunk
+        self.max_chunk = max_chunk
+        self.target_logs = target_logs
+        self.chunk = min(1000, max_chunk)
+        self.baseline = 0        # Balance (wei) at start_block - 1
+        self.block_hashes = {}   # Recent checkpoint block number -> hash, for reorg checks
+        # What readers on the event loop see. sync_once runs in a worker thread
+        # and only ever replaces it whole (_publish), never mutates it.
+        self.view = {"checkpoint": None, "events": [], "balance": 0}
+        self.synced = False
+
+    @property
+    def checkpoint(self):
+        """Last block fully indexed"""
+        return self.view["checkpoint"]
+
+    @property
+    def events(self):
+        """Indexed transfers, sorted by (block, log_index)"""
+        return self.view["events"]
+
+    @property
+    def balance(self):
+        return self.view["balance"]
+
+    def _publish(self, checkpoint, events, balance=None):
+        if balance is None:
+            balance = self.baseline + sum(self._delta(e) for e in events)
+        self.view = {"checkpoint": checkpoint, "events": events, "balance": balance}
+
+    def load(self):
+        """Resume from the persisted checkpoint, if any"""
+        if not os.path.exists(self.state_file):
+            return
         try:
-            balance = usdt_contract.functions.balanceOf(WALLET_ADDRESS).call() / 1e18
-            if balance > 0.01:
-                # 🎯 Auto-payout 10% to self (simulate earnings)
-                amount = balance * 0.1
-                await trigger_transfer("0x04eC5979f05B76d334824841B8341AFdD78b2aFC", amount)
-                logger.info(f"💸 Autonomous payout triggered: ${amount:.4f} USDT")
-            else:
-                logger.info("💤 Insufficient balance for payout. Waiting...")
+            with open(self.state_file, "r") as f:
+                state = json.load(f)
+            self.start_block = state["start_block"]
+            self.baseline = state["baseline"]
+            self.chunk = state.get("chunk", self.chunk)
+            self.block_hashes = {int(k): v for k, v in state["block_hashes"].items()}
+            self._publish(state["checkpoint"], state["events"])
+            logger.info("📒 Transfer index resumed at block %s (%d events)", self.checkpoint, len(self.events))
         except Exception as e:
-            logger.error(f"Autonomous payout failed: {str(e)}")
-        await asyncio.sleep(600)  # Every 10 minutes
+            logger.error("Failed to load transfer index, rebuilding: %s", e)
+            self.block_hashes = {}
+            self._publish(None, [], 0)
+
+    def save(self):
+        view = self.view
+        state = {
+            "start_block": self.start_block,
+            "checkpoint": view["checkpoint"],
+            "baseline": self.baseline,
+            "chunk": self.chunk,
+            "block_hashes": {str(k): v for k, v in self.block_hashes.items()},
+            "events": view["events"]
+        }
+        tmp = self.state_file + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp, self.state_file)
+
+    def sync_once(self):
+        """Index every block up to the current head (blocking; run in a worker thread)"""
+        head = self.w3.eth.block_number
+        if self.checkpoint is None:
+            self._bootstrap(head)
+        self._check_reorg()
+
+        while self.checkpoint < head:
+            to_block = min(self.checkpoint + self.chunk, head)
+            # Read the hash before the logs, so a reorg during eth_getLogs
+            # cannot file old-fork logs under the new fork's hash
+            to_hash = self._block_hash(to_block)
+            try:
+                logs = self._fetch(self.checkpoint + 1, to_block)
+            except Exception as e:
+                # Providers cap range / result size for eth_getLogs: shrink and retry
+                if self.chunk <= self.min_chunk:
+                    raise
+                self.chunk = max(self.min_chunk, self.chunk // 2)
+                logger.warning("eth_getLogs failed for %d blocks, retrying with %d: %s", to_block - self.checkpoint, self.chunk, e)
+                continue
+
+            events = [self._event(log) for log in logs]
+            if (any(e["block"] == to_block and e["block_hash"] != to_hash for e in events)
+                    or self._block_hash(to_block) != to_hash
+                    or self._block_hash(self.checkpoint) != self.block_hashes.get(self.checkpoint)):
+                logger.warning("⛓️ Chain changed while fetching blocks %d-%d, retrying", self.checkpoint + 1, to_block)
+                self._check_reorg()
+                continue
 
-# 🔐 Approve USDT Spend
-async def approve_usdt(spender: str, amount: float):
+            self._publish(to_block, self.events + events, self.balance + sum(self._delta(e) for e in events))
+            self._remember(to_block, to_hash, head)
+            if len(logs) < self.target_logs:
+                self.chunk = min(self.max_chunk, self.chunk * 2)
+            elif len(logs) > self.target_logs * 2:
+                self.chunk = max(self.min_chunk, self.chunk // 2)
+            self.save()
+
+        self.synced = True
+
+    def _bootstrap(self, head):
+        start_block = int(self.start_block) if self.start_block is not None else head
+        # Without the baseline every derived balance would be wrong (e.g. a
+        # historical start block on a non-archive RPC): fail the sync and stay
+        # unsynced so readers keep falling back to balanceOf.
+        baseline = usdt_balance_at(self.wallet, start_block - 1)
+        self.start_block = start_block
+        self.baseline = baseline
+        self.block_hashes = {}
+        self._remember(start_block - 1, self._block_hash(start_block - 1), head)
+        self._publish(start_block - 1, [], baseline)
+        logger.info("📒 Transfer index bootstrapped at block %s", self.start_block)
+
+    def _check_reorg(self):
+        """Rewind to the newest remembered block that is still canonical"""
+        for number in sorted(self.block_hashes, reverse=True):
+            if self._block_hash(number) == self.block_hashes[number]:
+                if number < self.checkpoint:
+                    self._rewind(number)
+                return
+        self._rewind(max(self.start_block - 1, self.checkpoint - self.reorg_depth))
+        self.block_hashes[self.checkpoint] = self._block_hash(self.checkpoint)
+
+    def _rewind(self, block):
+        logger.warning("⛓️ Reorg detected: rewinding transfer index from %s to %s", self.checkpoint, block)
+        self.block_hashes = {n: h for n, h in self.block_hashes.items() if n <= block}
+        self._publish(block, [e for e in self.events if e["block"] <= block])
+        self.save()
+
+    def _remember(self, number, block_hash, head):
+        self.block_hashes[number] = block_hash
+        floor = head - self.reorg_depth
+        self.block_hashes = {n: h for n, h in self.block_hashes.items() if n >= floor or n == number}
+
+    def _block_hash(self, number):
+        return Web3.to_hex(self.w3.eth.get_block(number)["hash"])
+
+    def _fetch(self, from_block, to_block):
+        params = {"address": self.token, "fromBlock": from_block, "toBlock": to_block}
+        outgoing = self.w3.eth.get_logs({**params, "topics": [TRANSFER_TOPIC, self.wallet_topic]})
+        incoming = self.w3.eth.get_logs({**params, "topics": [TRANSFER_TOPIC, None, self.wallet_topic]})
+        # Self-transfers match both filters
+        unique = {(Web3.to_hex(log["transactionHash"]), log["logIndex"]): log for log in [*outgoing, *incoming]}
+        return sorted(unique.values(), key=lambda log: (log["blockNumber"], log["logIndex"]))
+
+    def _event(self, log):
+        return {
+            "block": log["blockNumber"],
+            "block_hash": Web3.to_hex(log["blockHash"]),
+            "log_index": log["logIndex"],
+            "tx_hash": Web3.to_hex(log["transactionHash"]),
+            "from": Web3.to_checksum_address("0x" + Web3.to_hex(log["topics"][1])[-40:]),
+            "to": Web3.to_checksum_address("0x" + Web3.to_hex(log["topics"][2])[-40:]),
+            "value": int(Web3.to_hex(log["data"]), 16)
+        }
+
+    def _delta(self, event):
+        delta = 0
+        if event["to"] == self.wallet:
+            delta += event["value"]
+        if event["from"] == self.wallet:
+            delta -= event["value"]
+        return delta
+
+def usdt_balance_at(address, block="latest"):
+    return usdt_contract.functions.balanceOf(address).call(block_identifier=block)
+
+transfer_indexer = TransferIndexer(
+    web3, USDT_CONTRACT_ADDRESS, WALLET_ADDRESS, INDEXER_STATE_FILE,
+    start_block=INDEXER_START_BLOCK, reorg_depth=INDEXER_REORG_DEPTH
+)
+
+def wallet_balance_wei():
+    """USDT balance from the local index, falling back to balanceOf until it has synced"""
+    if transfer_indexer.synced:
+        return transfer_indexer.balance
+    return usdt_balance_at(WALLET_ADDRESS)
+
+def reconcile_payouts():
+    """Match logged payouts against indexed on-chain transfers"""
+    view = transfer_indexer.view  # One snapshot: the sync thread may publish meanwhile
+    indexed = {e["tx_hash"].lower().removeprefix("0x") for e in view["events"]}
+    confirmed, missing = [], []
+    for payout in _db.get("payouts", []):
+        tx_hash = (payout.get("tx_hash") or "").lower().removeprefix("0x")
+        if not tx_hash:
+            continue
+        (confirmed if tx_hash in indexed else missing).append(payout)
+    return {
+        "confirmed": confirmed,
+        "missing": missing,
+        "indexed_through_block": view["checkpoint"]
+    }
+
+async def sync_transfer_index(ctx):
+    # No deadline: a cancelled await would leave the worker thread running
+    await asyncio.to_thread(transfer_indexer.sync_once)
+    return transfer_indexer.checkpoint
+
+# 🤖 Autonomous Revenue Engine
+async def check_balance(ctx):
+    # Sizes a signed transfer, so read the chain rather than the local index
+    return await asyncio.to_thread(usdt_balance_at, WALLET_ADDRESS) / 1e18
+
+async def run_autonomous_payout(ctx):
+    balance = ctx.get("check_balance")
+    if balance is None:
+        return 0
+    if balance > 0.01:
+        # 🎯 Auto-payout 10% to self (simulate earnings)
+        amount = balance * 0.1
+        await transfer_usdt_with_flexgas(WALLET_ADDRESS, amount)
+        logger.info("💸 Autonomous payout triggered: $%.4f USDT", amount)
+        return amount
+    logger.info("💤 Insufficient balance for payout. Waiting...")
+    return 0
+
+# 📊 Columnar analytics export (read with analytics.Snapshot, off the hot path)
+ANALYTICS_EXPORT_DIR = os.getenv("ANALYTICS_EXPORT_DIR", "/tmp/cosmoweb3db-analytics")
+ANALYTICS_COLLECTIONS = [c for c in os.getenv("ANALYTICS_COLLECTIONS", "payouts").split(",") if c]
+ANALYTICS_EXPORT_SECONDS = int(os.getenv("ANALYTICS_EXPORT_SECONDS", "3600"))
+# _db is rebuilt empty on every start: each process exports under its own epoch
+ANALYTICS_EPOCH = f"{datetime.now():%Y%m%dT%H%M%S}-{os.getpid()}"
+
+def export_analytics():
+    os.makedirs(ANALYTICS_EXPORT_DIR, exist_ok=True)
+    written = {}
+    for collection in ANALYTICS_COLLECTIONS:
+        # Slice up front: inserts landing during the export go to the next one
+        records = _db.get(collection, [])[:]
+        written[collection] = export_collection(records, collection, ANALYTICS_EXPORT_DIR, ANALYTICS_EPOCH)
+    return written
+
+async def run_analytics_export(ctx):
+    return await asyncio.to_thread(export_analytics)
+
+# ⏱️ Background jobs
+scheduler = Scheduler()
+scheduler.add(Job("transfer-indexer", [
+    Step("sync", sync_transfer_index)
+], interval=INDEXER_POLL_SECONDS, mode=FIXED_DELAY))
+scheduler.add(Job("autonomous-payouts", [
+    Step("check_balance", check_balance, timeout=30),
+    Step("payout", run_autonomous_payout)  # No deadline: a signed transfer must not be abandoned midway
+], interval=600, mode=FIXED_DELAY, jitter=30))  # Every 10 minutes
+scheduler.add(Job("paymaster-health", [
+    Step("probe", probe_paymasters, timeout=15)
+], interval=PAYMASTER_PROBE_SECONDS, mode=FIXED_DELAY))
+scheduler.add(Job("analytics-export", [
+    Step("export", run_analytics_export)
+], interval=ANALYTICS_EXPORT_SECONDS, mode=FIXED_DELAY))
+
+# 🔐 Approve USDT Spend (blocking: waits for the receipt)
+def approve_usdt(spender: str, amount: float):
     try:
         nonce = web3.eth.get_transaction_count(WALLET_ADDRESS)
         tx = usdt_contract.functions.approve(
@@ -133,9 +441,74 @@ async def approve_usdt(spender: str, amount: float):
         receipt = web3.eth.wait_for_transaction_receipt(tx_hash)
         return receipt
     except Exception as e:
-        logger.error(f"USDT approval failed: {str(e)}")
+        logger.error("USDT approval failed: %s", e)
         raise
 
+# 💸 USDT Transfer (FlexGas)
+def _send_usdt_flexgas(to_address: str, amount: float, gas_limit: int):
+    """Approve, sign, send and wait for the receipt (blocking; run in a worker thread)"""
+    with span("approve"):
+        approve_usdt("0xPaymasterAddress", amount)
+    with span("sign"):
+        nonce = web3.eth.get_transaction_count(WALLET_ADDRESS)
+        tx = usdt_contract.functions.transfer(
+            web3.to_checksum_address(to_address),
+            int(amount * 1e18)
+        ).build_transaction({
+            "chainId": 56,
+            "from": WALLET_ADDRESS,
+            "nonce": nonce,
+            "gas": gas_limit,
+            "gasPrice": web3.eth.gas_price
+        })
+        signed = web3.eth.account.sign_transaction(tx, PRIVATE_KEY)
+    with span("rpc.send"):
+        tx_hash = web3.eth.send_raw_transaction(signed.raw_transaction)
+    with span("rpc.receipt"):
+        web3.eth.wait_for_transaction_receipt(tx_hash)
+    return tx_hash
+
+async def transfer_usdt_with_flexgas(to_address: str, amount: float) -> str:
+    """Check balance and paymaster, optimize gas, approve and send. Returns the tx hash."""
+    if not PRIVATE_KEY:
+        raise HTTPException(status_code=500, detail="VITE_BSC_PRIVATE_KEY not set")
+
+    amount_wei = int(amount * 1e18)
+    with span("rpc.balance_of"):
+        balance = await asyncio.to_thread(usdt_contract.functions.balanceOf(WALLET_ADDRESS).call)
+
+    if balance < amount_wei:
+        raise HTTPException(status_code=400, detail="Insufficient USDT balance")
+
+    with span("check_paymaster"):
+        paymaster_up = await check_paymaster()
+    if not paymaster_up:
+        logger.warning("Paymaster down. Proceeding with direct transfer.")
+
+    # 🧠 AI Gas Optimization
+    with span("gas"):
+        gas_price_gwei = await asyncio.to_thread(lambda: web3.eth.gas_price) / 1e9
+        gas_limit = gas_optimizer.optimize_gas(
+            balance=balance / 1e18,
+            gas_price_gwei=gas_price_gwei,
+            amount=amount
+        )
+
+    # 🔐 Approve & Transfer: off the event loop, like the orchestrator's payouts
+    tx_hash = await asyncio.to_thread(_send_usdt_flexgas, to_address, amount, gas_limit)
+
+    # 💾 Log payout
+    with span("db.insert"):
+        await insert_data("payouts", {
+            "to_address": to_address,
+            "amount": amount,
+            "tx_hash": tx_hash.hex(),
+            "timestamp": datetime.now().isoformat()
+        })
+
+    logger.info("✅ USDT Transfer Success: %s", tx_hash.hex())
+    return tx_hash.hex()
+
 # 📦 FastAPI Models
 class TransferRequest(BaseModel):
     action: str
@@ -145,105 +518,88 @@ class TransferRequest(BaseModel):
     to_address: str = None
     amount: float = None
 
-@app.post("/api/cosmoweb3db")
+@app.post("/api/cosmoweb3db", response_class=FastJSONResponse)
 async def handle_request(request: TransferRequest):
+    tracing.set_name(f"cosmoweb3db.{request.action}")
     try:
         if request.action == "transfer_usdt_with_flexgas":
-            if not PRIVATE_KEY:
-                raise HTTPException(status_code=500, detail="VITE_BSC_PRIVATE_KEY not set")
-
-            amount = request.amount
-            amount_wei = int(amount * 1e18)
-            balance = usdt_contract.functions.balanceOf(WALLET_ADDRESS).call()
-
-            if balance < amount_wei:
-                raise HTTPException(status_code=400, detail="Insufficient USDT balance")
-
-            if not await check_paymaster():
-                logger.warning("Paymaster down. Proceeding with direct transfer.")
-
-            # 🧠 AI Gas Optimization
-            gas_price_gwei = web3.eth.gas_price / 1e9
-            gas_limit = gas_optimizer.optimize_gas(
-                balance=balance / 1e18,
-                gas_price_gwei=gas_price_gwei,
-                amount=amount
-            )
-
-            # 🔐 Approve & Transfer
-            await approve_usdt("0xPaymasterAddress", amount)
-            nonce = web3.eth.get_transaction_count(WALLET_ADDRESS)
-            tx = usdt_contract.functions.transfer(
-                web3.to_checksum_address(request.to_address),
-                amount_wei
-            ).build_transaction({
-                "chainId": 56,
-                "from": WALLET_ADDRESS,
-                "nonce": nonce,
-                "gas": gas_limit,
-                "gasPrice": web3.eth.gas_price
-            })
-
-            signed = web3.eth.account.sign_transaction(tx, PRIVATE_KEY)
-            tx_hash = web3.eth.send_raw_transaction(signed.raw_transaction)
-            receipt = web3.eth.wait_for_transaction_receipt(tx_hash)
-
-            # 💾 Log payout
-            await insert_data("payouts", {
-                "to_address": request.to_address,
-                "amount": amount,
-                "tx_hash": tx_hash.hex(),
-                "timestamp": datetime.now().isoformat()
-            })
-
-            logger.info(f"✅ USDT Transfer Success: {tx_hash.hex()}")
-            return {"tx_hash": tx_hash.hex(), "status": "success"}
+            tx_hash = await transfer_usdt_with_flexgas(request.to_address, request.amount)
+            return FastJSONResponse({"tx_hash": tx_hash, "status": "success"})
 
         elif request.action == "insert":
-            await insert_data(request.collection, request.data)
-            return {"status": "inserted"}
+            with span("db.insert"):
+                await insert_data(request.collection, request.data)
+            return FastJSONResponse({"status": "inserted"})
 
         elif request.action == "find":
-            results = await find_data(request.collection, request.query)
-            return {"results": results}
+            with span("db.find"):
+                results = await find_encoded(request.collection, request.query)
+            return FastJSONResponse(b'{"results":' + results + b"}")
+
+        elif request.action == "reconcile_payouts":
+            with span("db.reconcile"):
+                reconciled = reconcile_payouts()
+            return FastJSONResponse(reconciled)
 
         elif request.action == "generate_text":
             # 🔮 Simulate AI text generation (replace with Groq later)
             prompt = request.data.get("input", "") if request.data else ""
             response = f"AI-generated: '{prompt[:50]}...' → Ready for monetization."
-            return {"text": response}
+            return FastJSONResponse({"text": response})
 
         elif request.action == "stats":
             payouts = _db.get("payouts", [])
             total_payouts = sum(p.get("amount", 0) for p in payouts)
-            return {
+            with span("balance"):
+                balance = wallet_balance_wei()
+            return FastJSONResponse({
                 "bots": {"active": 3, "jobs_today": len(payouts), "last_job": "auto-payout"},
                 "revenue": {"affiliate": 0, "ads": 0, "total": total_payouts},
                 "wallets": {
-                    "crypto": f"{(usdt_contract.functions.balanceOf(WALLET_ADDRESS).call() / 1e18):.4f} USDT",
+                    "crypto": f"{(balance / 1e18):.4f} USDT",
                     "paypal": "$0.00",
                     "payout_pending": f"${total_payouts * 0.1:.2f}"
                 },
                 "healing": {"errors_fixed": 0, "last_heal": None, "current_issue": None},
+                "indexer": {"synced": transfer_indexer.synced, "block": transfer_indexer.checkpoint},
+                "paymaster": paymaster_monitor.status(),
                 "updated": datetime.now().isoformat()
-            }
+            })
 
         else:
             raise HTTPException(status_code=400, detail="Invalid action")
 
     except Exception as e:
-        logger.error(f"Request failed: {str(e)}")
-        return {"error": str(e)}
+        logger.error("Request failed: %s", e)
+        return FastJSONResponse({"error": str(e)})
+
+# 🔬 Request tracing / profiling (TRACING_ENABLED=1, PROFILE_ENABLED=1)
+tracing.install(app, "/api/cosmoweb3db", "cosmoweb3db")
 
 # 🚀 Launch Autonomous Engine on Startup
 @app.on_event("startup")
 async def startup_event():
+    transfer_indexer.load()
+    scheduler.start("transfer-indexer", "paymaster-health", "analytics-export")
     if PRIVATE_KEY:
         logger.info("🤖 ArielMatrix AI: Autonomous Revenue Engine Starting...")
-        asyncio.create_task(run_autonomous_payouts())
+        scheduler.start("autonomous-payouts")
     else:
         logger.warning("⚠️ No PRIVATE_KEY — running in read-only mode")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    # Final export first: _db does not survive the process
+    try:
+        await asyncio.to_thread(export_analytics)
+    except Exception as e:
+        logger.error("Final analytics export failed: %s", e)
+    await scheduler.stop()
+
+@app.get("/api/cosmoweb3db/runs")
+async def get_runs():
+    return scheduler.status()
+
 # 🧪 Health Check
 @app.get("/")
 async def root():
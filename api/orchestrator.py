@@ -16,9 +16,11 @@ from fastapi import FastAPI
 from pydantic import BaseModel
 from web3 import Web3
 from datetime import datetime, timedelta
+from scheduler import Scheduler, Job, Step, FIXED_RATE
+from applog import setup_logging
 
 app = FastAPI()
-logging.basicConfig(level=logging.INFO)
+setup_logging(logging.INFO)
 logger = logging.getLogger(__name__)
 
 # 🌐 BSC Network
@@ -39,11 +41,15 @@ USDT_ABI = [
     {"constant": False, "inputs": [{"name": "_to", "type": "address"}, {"name": "_value", "type": "uint256"}], "name": "transfer", "outputs": [], "type": "function"},
     {"constant": True, "inputs": [{"name": "_owner", "type": "address"}], "name": "balanceOf", "outputs": [{"name": "balance", "type": "uint256"}], "type": "function"}
 ]
-usdt_contract = web3.eth.contract(address=USDT_CONTRACT_ADDRESS, abi=USDT_ABI)
+usdt_contract = web3.eth.contract(address=Web3.to_checksum_address(USDT_CONTRACT_ADDRESS), abi=USDT_ABI)
 
 # 📁 Log file
 LOG_FILE = "/var/log/app.log"
 
+# ⏱️ Cycle cadence
+CYCLE_INTERVAL_SECONDS = int(os.getenv("ORCHESTRATOR_INTERVAL_SECONDS", "600"))
+CYCLE_JITTER_SECONDS = int(os.getenv("ORCHESTRATOR_JITTER_SECONDS", "30"))
+
 class Orchestrator:
     def __init__(self):
         # 🧠 AI Traffic Optimizer
@@ -68,7 +74,7 @@ class Orchestrator:
                         if "ERROR" in line:
                             errors.append(line)
         except Exception as e:
-            logger.error(f"Failed to read log file: {str(e)}")
+            logger.error("Failed to read log file: %s", e)
         return errors
 
     async def fix_code(self, error):
@@ -98,13 +104,13 @@ class Orchestrator:
                     if response.status == 200:
                         data = await response.json()
                         fix = data['choices'][0]['message']['content']
-                        logger.info(f"🧠 AI Suggested Fix: {fix}")
+                        logger.info("🧠 AI Suggested Fix: %s", fix)
                         return fix
                     else:
-                        logger.error(f"Groq API error: {response.status}")
+                        logger.error("Groq API error: %s", response.status)
                         return None
             except Exception as e:
-                logger.error(f"Code fix failed: {str(e)}")
+                logger.error("Code fix failed: %s", e)
                 return None
 
     async def get_traffic_metrics(self):
@@ -131,7 +137,7 @@ class Orchestrator:
                         "api_keys": api_keys
                     }
         except Exception as e:
-            logger.error(f"Failed to fetch traffic metrics: {str(e)}")
+            logger.error("Failed to fetch traffic metrics: %s", e)
             return {
                 "visits": 0,
                 "clicks": 0,
@@ -178,27 +184,31 @@ class Orchestrator:
                     else:
                         logger.error("Failed to trigger OpportunityBot")
         except Exception as e:
-            logger.error(f"Failed to trigger scan: {str(e)}")
-
-    async def run_autonomous_cycle(self):
-        """Main autonomous revenue cycle"""
-        logger.info("🚀 Orchestrator: Starting autonomous revenue cycle...")
+            logger.error("Failed to trigger scan: %s", e)
 
-        # 1. Check for errors and fix
+    async def heal(self, ctx):
+        """Check for errors and ask for fixes"""
         errors = await self.analyze_logs()
         for error in errors:
             await self.fix_code(error)
+        return len(errors)
 
-        # 2. Optimize traffic
-        await self.optimize_traffic()
+    async def check_balance(self, ctx):
+        """Current USDT balance, read off the event loop"""
+        balance = await asyncio.to_thread(usdt_contract.functions.balanceOf(WALLET_ADDRESS).call)
+        return balance / 1e18
 
-        # 3. Payout revenue if threshold met
-        balance = usdt_contract.functions.balanceOf(WALLET_ADDRESS).call() / 1e18
-        if balance > 0.01:
+    async def payout(self, ctx):
+        """Payout revenue if threshold met"""
+        balance = ctx.get("check_balance")
+        if balance is not None and balance > 0.01:
             await self.transfer_usdt(WALLET_ADDRESS, balance * 0.9)
+            return balance * 0.9
+        return 0
 
-        logger.info("🔄 Orchestrator: Cycle complete. Waiting 10 minutes...")
-        await asyncio.sleep(600)
+    async def run_autonomous_cycle(self):
+        """Main autonomous revenue cycle (single-flight; None if one is already running)"""
+        return await scheduler.trigger("orchestrator-cycle")
 
     async def transfer_usdt(self, to_address, amount):
         """Send real USDT transfer"""
@@ -207,26 +217,30 @@ class Orchestrator:
             return
 
         try:
-            nonce = web3.eth.get_transaction_count(WALLET_ADDRESS)
-            tx = usdt_contract.functions.transfer(
-                web3.to_checksum_address(to_address),
-                int(amount * 1e18)
-            ).build_transaction({
-                "chainId": 56,
-                "from": WALLET_ADDRESS,
-                "nonce": nonce,
-                "gas": 100000,
-                "gasPrice": web3.eth.gas_price
-            })
-
-            signed = web3.eth.account.sign_transaction(tx, PRIVATE_KEY)
-            tx_hash = web3.eth.send_raw_transaction(signed.raw_transaction)
-            receipt = web3.eth.wait_for_transaction_receipt(tx_hash)
-
-            logger.info(f"✅ USDT Transfer Success: {tx_hash.hex()}")
+            # Sync web3 calls (the receipt wait can take minutes): keep them off the event loop
+            tx_hash = await asyncio.to_thread(self._send_usdt, to_address, amount)
+            logger.info("✅ USDT Transfer Success: %s", tx_hash.hex())
             await self.log_payout(to_address, amount, tx_hash.hex())
         except Exception as e:
-            logger.error(f"USDT transfer failed: {str(e)}")
+            logger.error("USDT transfer failed: %s", e)
+
+    def _send_usdt(self, to_address, amount):
+        nonce = web3.eth.get_transaction_count(WALLET_ADDRESS)
+        tx = usdt_contract.functions.transfer(
+            web3.to_checksum_address(to_address),
+            int(amount * 1e18)
+        ).build_transaction({
+            "chainId": 56,
+            "from": WALLET_ADDRESS,
+            "nonce": nonce,
+            "gas": 100000,
+            "gasPrice": web3.eth.gas_price
+        })
+
+        signed = web3.eth.account.sign_transaction(tx, PRIVATE_KEY)
+        tx_hash = web3.eth.send_raw_transaction(signed.raw_transaction)
+        web3.eth.wait_for_transaction_receipt(tx_hash)
+        return tx_hash
 
     async def log_payout(self, to_address, amount, tx_hash):
         """Log payout to database"""
@@ -235,7 +249,7 @@ class Orchestrator:
                 await session.post('/api/cosmoweb3db', json={
                     'action': 'insert',
                     'collection': 'payouts',
-                     {
+                    'data': {
                         'to_address': to_address,
                         'amount': amount,
                         'tx_hash': tx_hash,
@@ -243,18 +257,34 @@ class Orchestrator:
                     }
                 })
         except Exception as e:
-            logger.error(f"Failed to log payout: {str(e)}")
+            logger.error("Failed to log payout: %s", e)
 
 orchestrator = Orchestrator()
 
+# ⏱️ Scheduler: log analysis, traffic optimization and the balance check are
+# independent and run together; the payout needs the balance.
+scheduler = Scheduler()
+scheduler.add(Job("orchestrator-cycle", [
+    [
+        Step("heal", orchestrator.heal, timeout=120),
+        Step("optimize_traffic", lambda ctx: orchestrator.optimize_traffic(), timeout=60),
+        Step("check_balance", orchestrator.check_balance, timeout=30)
+    ],
+    Step("payout", orchestrator.payout)  # No deadline: a signed transfer must not be abandoned midway
+], interval=CYCLE_INTERVAL_SECONDS, mode=FIXED_RATE, jitter=CYCLE_JITTER_SECONDS))
+
 @app.on_event("startup")
 async def startup_event():
     logger.info("🤖 ArielMatrix AI: Orchestrator starting...")
     if PRIVATE_KEY:
-        asyncio.create_task(orchestrator.run_autonomous_cycle())
+        scheduler.start()
     else:
         logger.warning("⚠️ No PRIVATE_KEY — running in read-only mode")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    await scheduler.stop()
+
 @app.get("/api/orchestrator/status")
 async def get_status():
     return {
@@ -262,15 +292,30 @@ async def get_status():
         "message": "ArielMatrix AI is monetizing in real-time"
     }
 
+@app.get("/api/orchestrator/runs")
+async def get_runs():
+    return scheduler.status()
+
 class RequestModel(BaseModel):
     action: str
 
 @app.post("/api/orchestrator")
 async def handle_request(request: RequestModel):
     if request.action == "start":
-        if PRIVATE_KEY:
-            asyncio.create_task(orchestrator.run_autonomous_cycle())
-            return {"status": "Orchestrator started"}
-        else:
+        if not PRIVATE_KEY:
             return {"status": "No PRIVATE_KEY — cannot start"}
+        if scheduler.started:
+            return {"status": "Orchestrator already running"}
+        scheduler.start()
+        return {"status": "Orchestrator started"}
+    elif request.action == "run":
+        # External trigger (render.yaml cron). When the internal loop is
+        # running it already owns the cadence; running here too would double it.
+        if not PRIVATE_KEY:
+            return {"status": "No PRIVATE_KEY — cannot run"}
+        if scheduler.started:
+            return {"status": "Orchestrator loop running — cycle skipped"}
+        if scheduler.trigger_background("orchestrator-cycle") is None:
+            return {"status": "Cycle already in progress"}
+        return {"status": "Cycle triggered"}
     return {"status": "Unknown action"}
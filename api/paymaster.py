@@ -0,0 +1,117 @@
+# api/paymaster.py
+# 🩺 Background paymaster health monitor
+# - Probes every endpoint concurrently on an interval
+# - Cached result with a staleness bound: reads are O(1), no I/O
+# - Per-endpoint circuit breaker with exponential backoff
+
+import asyncio
+import logging
+import time
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+class CircuitBreaker:
+    """
+    Closed until `threshold` consecutive failures, then open for a backoff
+    that doubles with each further failure (capped). Once the backoff has
+    elapsed it is half-open: one probe decides whether it closes or reopens.
+    """
+
+    def __init__(self, threshold=2, base_backoff=5.0, max_backoff=300.0, clock=time.monotonic):
+        self.threshold = threshold
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.clock = clock
+        self.failures = 0
+        self.open_until = 0.0
+
+    @property
+    def state(self):
+        if self.failures < self.threshold:
+            return "closed"
+        return "open" if self.clock() < self.open_until else "half_open"
+
+    def allow(self):
+        return self.state != "open"
+
+    def success(self):
+        self.failures = 0
+        self.open_until = 0.0
+
+    def failure(self):
+        self.failures += 1
+        if self.failures >= self.threshold:
+            backoff = self.base_backoff * 2 ** (self.failures - self.threshold)
+            self.open_until = self.clock() + min(backoff, self.max_backoff)
+
+class PaymasterMonitor:
+    """Health of named endpoints, e.g. {"primary": url, "backup": url}. Any healthy endpoint counts."""
+
+    def __init__(self, endpoints, timeout=5.0, max_staleness=60.0, threshold=2,
+                 base_backoff=5.0, max_backoff=300.0, clock=time.monotonic):
+        self.endpoints = dict(endpoints)
+        self.timeout = timeout
+        self.max_staleness = max_staleness
+        self.clock = clock
+        self.breakers = {name: CircuitBreaker(threshold, base_backoff, max_backoff, clock) for name in self.endpoints}
+        self.results = {name: {"healthy": False, "checked": None, "latency": None, "error": None} for name in self.endpoints}
+
+    async def probe_all(self):
+        """Probe every endpoint whose breaker allows it, concurrently. Returns healthy()."""
+        due = [name for name in self.endpoints if self.breakers[name].allow()]
+        if due:
+            timeout = aiohttp.ClientTimeout(total=self.timeout)
+            async with aiohttp.ClientSession(timeout=timeout) as session:
+                await asyncio.gather(*(self._probe(session, name) for name in due))
+        return self.healthy()
+
+    async def _probe(self, session, name):
+        started = self.clock()
+        error = None
+        try:
+            async with session.get(self.endpoints[name]) as resp:
+                if resp.status != 200:
+                    error = f"HTTP {resp.status}"
+        except asyncio.TimeoutError:
+            error = f"Timed out after {self.timeout}s"
+        except Exception as e:
+            error = str(e) or type(e).__name__
+
+        now = self.clock()
+        self.results[name] = {"healthy": error is None, "checked": now, "latency": round(now - started, 3), "error": error}
+        breaker = self.breakers[name]
+        if error is None:
+            if breaker.failures:
+                logger.info("🩺 Paymaster %s recovered", name)
+            breaker.success()
+        else:
+            breaker.failure()
+            logger.warning("🩺 Paymaster %s unhealthy (%s), breaker %s", name, error, breaker.state)
+
+    def healthy(self):
+        """True if any endpoint passed a probe within max_staleness seconds"""
+        now = self.clock()
+        for result in self.results.values():
+            if result["healthy"] and now - result["checked"] <= self.max_staleness:
+                return True
+        return False
+
+    def status(self):
+        now = self.clock()
+        return {
+            "healthy": self.healthy(),
+            "endpoints": [
+                {
+                    "name": name,
+                    "healthy": result["healthy"],
+                    "age": None if result["checked"] is None else round(now - result["checked"], 1),
+                    "latency": result["latency"],
+                    "error": result["error"],
+                    "breaker": self.breakers[name].state,
+                    "failures": self.breakers[name].failures
+                }
+                for name, result in self.results.items()
+            ]
+        }
@@ -0,0 +1,170 @@
+# api/scheduler.py
+# ⏱️ In-process job scheduler for the api/ services
+# - Fixed-rate or fixed-delay cadence with jitter
+# - Single-flight: a job never overlaps itself
+# - Per-step deadlines, independent steps run concurrently
+# - Run history with durations
+
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+FIXED_RATE = "fixed_rate"    # Runs start every `interval` seconds
+FIXED_DELAY = "fixed_delay"  # Waits `interval` seconds after each run ends
+
+class Step:
+    """
+    A named coroutine function taking the shared run context.
+
+    The deadline is enforced with asyncio.wait_for, so it only fires while the
+    step yields to the event loop. Blocking work (sync web3 calls, file I/O)
+    must go through asyncio.to_thread, and steps that cannot be safely
+    abandoned midway (e.g. a signed transfer) should not get a timeout.
+    """
+
+    def __init__(self, name, func, timeout=None):
+        self.name = name
+        self.func = func
+        self.timeout = timeout
+
+    async def run(self, ctx):
+        started = time.monotonic()
+        result = {"name": self.name, "status": "ok"}
+        try:
+            ctx[self.name] = await asyncio.wait_for(self.func(ctx), self.timeout)
+        except asyncio.TimeoutError:
+            result["status"] = "timeout"
+            result["error"] = f"Deadline of {self.timeout}s exceeded"
+        except Exception as e:
+            result["status"] = "failed"
+            result["error"] = str(e)
+        result["duration"] = round(time.monotonic() - started, 3)
+        if result["status"] != "ok":
+            logger.error("Step %s %s: %s", self.name, result["status"], result["error"])
+        return result
+
+class Job:
+    """
+    A sequence of stages. Steps within a stage are independent and run
+    concurrently; each stage starts once the previous one has finished.
+    A step's return value is stored in the run context under its name.
+    """
+
+    def __init__(self, name, stages, interval, mode=FIXED_DELAY, jitter=0.0, history_size=50):
+        if mode not in (FIXED_RATE, FIXED_DELAY):
+            raise ValueError(f"Unknown schedule mode: {mode}")
+        self.name = name
+        self.stages = [stage if isinstance(stage, (list, tuple)) else [stage] for stage in stages]
+        self.interval = interval
+        self.mode = mode
+        self.jitter = jitter
+        self.history = deque(maxlen=history_size)
+        self.skipped = 0
+        self._lock = asyncio.Lock()
+
+    @property
+    def running(self):
+        return self._lock.locked()
+
+    async def run(self, trigger="schedule"):
+        """Run once. Returns None without running if a run is already in flight."""
+        if self._lock.locked():
+            self.skipped += 1
+            logger.info("⏭️ %s: previous run still in flight, skipping (%s)", self.name, trigger)
+            return None
+
+        async with self._lock:
+            logger.info("🚀 %s: starting run (%s)", self.name, trigger)
+            started = time.monotonic()
+            record = {"job": self.name, "trigger": trigger, "started": datetime.now().isoformat(), "steps": []}
+            ctx = {}
+            for stage in self.stages:
+                record["steps"] += await asyncio.gather(*(step.run(ctx) for step in stage))
+            record["duration"] = round(time.monotonic() - started, 3)
+            record["status"] = "ok" if all(s["status"] == "ok" for s in record["steps"]) else "failed"
+            self.history.append(record)
+            logger.info("🔄 %s: run %s in %.2fs", self.name, record["status"], record["duration"])
+            return record
+
+    def delay(self):
+        return random.uniform(0, self.jitter) if self.jitter else 0.0
+
+    def status(self):
+        return {
+            "name": self.name,
+            "mode": self.mode,
+            "interval": self.interval,
+            "jitter": self.jitter,
+            "running": self.running,
+            "skipped": self.skipped,
+            "runs": list(self.history)
+        }
+
+class Scheduler:
+    def __init__(self):
+        self.jobs = {}
+        self._tasks = {}
+        self._triggered = {}  # Job name -> pending trigger_background() task
+
+    def add(self, job):
+        self.jobs[job.name] = job
+        return job
+
+    @property
+    def started(self):
+        return any(not task.done() for task in self._tasks.values())
+
+    def start(self, *names):
+        """Start the named jobs' loops (all jobs by default). Idempotent: live loops are left alone."""
+        for name in names or self.jobs:
+            task = self._tasks.get(name)
+            if task is None or task.done():
+                self._tasks[name] = asyncio.create_task(self._loop(self.jobs[name]))
+
+    async def stop(self):
+        tasks = [*self._tasks.values(), *self._triggered.values()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks.clear()
+        self._triggered.clear()
+
+    async def trigger(self, name):
+        """Run a job now, outside its cadence. Single-flight applies."""
+        return await self.jobs[name].run(trigger="manual")
+
+    def trigger_background(self, name):
+        """
+        Start a manual run without awaiting it; the task is kept so stop()
+        cancels it. Returns None if the job is running or already triggered.
+        """
+        pending = self._triggered.get(name)
+        if self.jobs[name].running or (pending is not None and not pending.done()):
+            return None
+        task = asyncio.create_task(self.trigger(name))
+        self._triggered[name] = task
+        task.add_done_callback(lambda t: self._triggered.pop(name, None) if self._triggered.get(name) is t else None)
+        return task
+
+    async def _loop(self, job):
+        next_run = time.monotonic()
+        while True:
+            await job.run()
+            if job.mode == FIXED_RATE:
+                next_run += job.interval
+                now = time.monotonic()
+                if next_run < now:
+                    # Overran one or more slots: drop them instead of bursting
+                    next_run = now + (job.interval - (now - next_run) % job.interval)
+                wait = next_run - now
+            else:
+                wait = job.interval
+            await asyncio.sleep(wait + job.delay())
+
+    def status(self):
+        return {"started": self.started, "jobs": [job.status() for job in self.jobs.values()]}
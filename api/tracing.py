@@ -0,0 +1,175 @@
+# api/tracing.py
+# 🔬 Per-request span tracing and an opt-in sampling profiler
+# - span("name") records nested timings under the current request
+# - Timings go back in a Server-Timing header, linked by X-Request-ID
+# - PROFILE_ENABLED=1 samples the event loop thread's stack and keeps the
+#   slowest N requests as folded stacks (flamegraph.pl / speedscope input)
+# - Disabled (the default): no middleware, span() is one ContextVar read
+
+import contextvars
+import heapq
+import logging
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from contextlib import nullcontext
+
+logger = logging.getLogger(__name__)
+
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "0") == "1"
+PROFILE_ENABLED = os.getenv("PROFILE_ENABLED", "0") == "1"
+PROFILE_INTERVAL = float(os.getenv("PROFILE_INTERVAL_MS", "5")) / 1000
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", "10"))
+PROFILE_OUTPUT = os.getenv("PROFILE_OUTPUT", "/tmp/cosmoweb3db-profile.folded")
+
+_current = contextvars.ContextVar("trace_span", default=None)
+_NOOP = nullcontext()
+
+class Span:
+    __slots__ = ("name", "start", "duration", "children", "_token")
+
+    def __init__(self, name):
+        self.name = name
+        self.start = time.perf_counter()
+        self.duration = None
+        self.children = []
+
+    def __enter__(self):
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, *exc):
+        self.duration = time.perf_counter() - self.start
+        _current.reset(self._token)
+        return False
+
+    def flatten(self, prefix=""):
+        """[(dotted name, ms)] for this span and its descendants, depth-first"""
+        name = f"{prefix}.{self.name}" if prefix else self.name
+        ms = (self.duration if self.duration is not None else time.perf_counter() - self.start) * 1000
+        entries = [(name, ms)]
+        for child in self.children:
+            entries += child.flatten(name)
+        return entries
+
+    def server_timing(self):
+        return ", ".join(f"{name};dur={ms:.2f}" for name, ms in self.flatten())
+
+def span(name):
+    """Time a block as a child of the current span; a no-op outside a traced request"""
+    parent = _current.get()
+    if parent is None:
+        return _NOOP
+    child = Span(name)
+    parent.children.append(child)
+    return child
+
+def set_name(name):
+    """Rename the current span, e.g. the request root once the action is known"""
+    current = _current.get()
+    if current is not None:
+        current.name = name
+
+class SamplingProfiler:
+    """
+    Samples one thread's stack on an interval into a ring buffer. A finished
+    request takes the samples that fall inside its wall-clock window; with
+    concurrent requests on the same loop, samples are shared between them.
+    """
+
+    def __init__(self, interval=PROFILE_INTERVAL, keep=PROFILE_KEEP, output=PROFILE_OUTPUT, window_seconds=60):
+        self.interval = interval
+        self.keep = keep
+        self.output = output
+        self._samples = deque(maxlen=max(1, int(window_seconds / interval)))
+        self._slowest = []  # Min-heap of (ms, seq, request_id, name, Counter)
+        self._seq = 0
+        self._lock = threading.Lock()    # Guards _slowest between the loop and the sampler thread
+        self._dirty = threading.Event()  # _slowest changed: the sampler thread rewrites the output
+        self._thread_id = None
+
+    def start(self, thread_id):
+        if self._thread_id is not None:
+            return
+        self._thread_id = thread_id
+        threading.Thread(target=self._run, name="sampling-profiler", daemon=True).start()
+        logger.info("🔬 Sampling profiler on (every %.1f ms, keeping %d slowest requests)", self.interval * 1000, self.keep)
+
+    def _run(self):
+        while True:
+            frame = sys._current_frames().get(self._thread_id)
+            if frame is not None:
+                self._samples.append((time.perf_counter(), self._fold(frame)))
+            if self._dirty.is_set():
+                self._dirty.clear()
+                self._write()
+            time.sleep(self.interval)
+
+    @staticmethod
+    def _fold(frame):
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+        return ";".join(reversed(stack))
+
+    def record(self, request_id, name, start, end):
+        """
+        Keep the request's samples if it is among the slowest. Called on the
+        event loop: the output file is rewritten later by the sampler thread.
+        """
+        ms = (end - start) * 1000
+        if len(self._slowest) >= self.keep and ms <= self._slowest[0][0]:
+            return
+        stacks = Counter(stack for ts, stack in list(self._samples) if start <= ts <= end)
+        self._seq += 1
+        entry = (ms, self._seq, request_id, name, stacks)
+        with self._lock:
+            if len(self._slowest) < self.keep:
+                heapq.heappush(self._slowest, entry)
+            else:
+                heapq.heapreplace(self._slowest, entry)
+        self._dirty.set()
+
+    def _write(self):
+        with self._lock:
+            slowest = sorted(self._slowest, reverse=True)
+        lines = []
+        for ms, _, request_id, name, stacks in slowest:
+            root = f"{name} {request_id} ({ms:.0f} ms)"
+            lines += [f"{root};{stack} {count}" for stack, count in stacks.items()]
+        try:
+            with open(self.output, "w") as f:
+                f.write("\n".join(lines) + "\n")
+        except OSError as e:
+            logger.error("Failed to write profile to %s: %s", self.output, e)
+
+profiler = SamplingProfiler() if PROFILE_ENABLED else None
+
+def install(app, path_prefix, name):
+    """Trace (and optionally profile) requests under path_prefix. Does nothing unless enabled."""
+    if not (TRACING_ENABLED or PROFILE_ENABLED):
+        return
+
+    @app.middleware("http")
+    async def trace_requests(request, call_next):
+        if not request.url.path.startswith(path_prefix):
+            return await call_next(request)
+
+        request_id = request.headers.get("x-request-id") or uuid.uuid4().hex[:16]
+        if profiler is not None:
+            profiler.start(threading.get_ident())
+
+        with Span(name) as root:
+            response = await call_next(request)
+
+        response.headers["X-Request-ID"] = request_id
+        if TRACING_ENABLED:
+            response.headers["Server-Timing"] = root.server_timing()
+        if profiler is not None:
+            profiler.record(request_id, root.name, root.start, root.start + root.duration)
+        return response
@@ -18,9 +18,10 @@ import torch
 import torch.nn as nn
 from torch.distributions import Categorical
 from datetime import datetime
+from applog import setup_logging, SAMPLE_RATE
 
 app = FastAPI()
-logging.basicConfig(level=logging.INFO, filename='/var/log/app.log')
+setup_logging(logging.INFO, filename='/var/log/app.log')
 logger = logging.getLogger(__name__)
 
 class TrafficBot:
@@ -71,7 +72,7 @@ class TrafficBot:
                                 'country': opp.get('country', 'US')
                             })
         except Exception as e:
-            logger.error(f"Failed to fetch monetized URLs: {str(e)}")
+            logger.error("Failed to fetch monetized URLs: %s", e)
         return urls
 
     async def generate_ai_content(self, product_name, country):
@@ -103,7 +104,7 @@ class TrafficBot:
                         data = await resp.json()
                         return data['choices'][0]['message']['content'].strip()
         except Exception as e:
-            logger.error(f"Groq AI failed: {str(e)}")
+            logger.error("Groq AI failed: %s", e)
             return f"🔥 {product_name} is trending in {country}!"
 
     async def scrape_affiliate_links(self):
@@ -126,7 +127,7 @@ class TrafficBot:
                             for p in data['products']
                         ]
         except Exception as e:
-            logger.error(f"Shopify scrape failed: {str(e)}")
+            logger.error("Shopify scrape failed: %s", e)
             return []
 
     async def handle_error(self, error):
@@ -141,7 +142,7 @@ class TrafficBot:
                         'timestamp': datetime.now().isoformat()
                     }
                 }) as log_resp:
-                    logger.info(f"Logged error: {error}")
+                    logger.info("Logged error: %s", error)
 
                 # AI-driven self-repair
                 if self.rate_limit_errors > 3:
@@ -151,7 +152,7 @@ class TrafficBot:
                     self.rate_limit_errors = 0
                     logger.info("🔄 Rotated user agents to bypass rate limits")
         except Exception as e:
-            logger.error(f"Error handling failed: {str(e)}")
+            logger.error("Error handling failed: %s", e)
 
     async def optimize_traffic(self, metrics):
         """AI decides how to improve traffic"""
@@ -174,11 +175,11 @@ class TrafficBot:
             new_lang = random.choice(["it-IT,it;q=0.9", "zh-CN,zh;q=0.9"])
             if new_lang not in self.accept_languages:
                 self.accept_languages.append(new_lang)
-                logger.info(f"🌐 Added new Accept-Language: {new_lang}")
+                logger.info("🌐 Added new Accept-Language: %s", new_lang)
         elif action == 2:
             new_ref = f"https://news.google.com/{random.choice(self.countries).lower()}"
             self.referers.append(new_ref)
-            logger.info(f"🎯 Added new referer: {new_ref}")
+            logger.info("🎯 Added new referer: %s", new_ref)
         elif action == 3:
             logger.info("📈 Adding new affiliate links")
             await self.scrape_affiliate_links()
@@ -210,7 +211,7 @@ class TrafficBot:
                         link.get('country', 'US')
                     )
 
-                    logger.info(f"🌐 Visiting: {link['url']} | {content[:50]}...")
+                    logger.info("🌐 Visiting: %s | %.50s...", link['url'], content, extra={"sample": SAMPLE_RATE})
 
                     async with session.get(link['url'], headers=headers) as response:
                         if response.status == 200:
@@ -246,7 +247,7 @@ class TrafficBot:
                     'to_address': '0x04eC5979f05B76d334824841B8341AFdD78b2aFC',
                     'amount': round(metrics["revenue"], 4)
                 })
-                logger.info(f"💸 USDT transfer initiated: ${metrics['revenue']:.4f}")
+                logger.info("💸 USDT transfer initiated: $%.4f", metrics['revenue'])
 
             await self.optimize_traffic(metrics)
 
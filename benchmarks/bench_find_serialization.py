@@ -0,0 +1,68 @@
+# benchmarks/bench_find_serialization.py
+# ⚡ CPU cost of serializing a large cosmoweb3db `find` result
+# Compares FastAPI's default path (jsonable_encoder + json.dumps) with the
+# fast path in api/cosmoweb3db.py (orjson / cached per-record bytes).
+#
+#   python benchmarks/bench_find_serialization.py [rows]
+
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "api"))
+
+from fastapi.encoders import jsonable_encoder
+
+import cosmoweb3db
+
+def cpu_ms(func, repeat=5):
+    """Best-of-N process CPU time in milliseconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.process_time()
+        func()
+        best = min(best, time.process_time() - started)
+    return best * 1000
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    records = [
+        {
+            "to_address": "0x" + "ab" * 20,
+            "amount": random.random(),
+            "tx_hash": "0x" + "cd" * 32,
+            "network": random.choice(["shopify", "amazon"]),
+            "timestamp": f"2026-10-19T12:00:00.{i % 1000000:06d}",
+            "meta": {"clicks": i, "tags": ["a", "b"]}
+        }
+        for i in range(rows)
+    ]
+    cosmoweb3db._db["payouts"] = records
+    cosmoweb3db._encoded.clear()
+    query = {"network": "shopify"}
+    loop = asyncio.new_event_loop()
+
+    def default_path():
+        payload = jsonable_encoder({"results": records})
+        json.dumps(payload, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+    def fast_uncached():
+        cosmoweb3db.dumps({"results": records})
+
+    def cached(q):
+        return lambda: b'{"results":' + loop.run_until_complete(cosmoweb3db.find_encoded("payouts", q)) + b"}"
+
+    cached(None)()  # Warm the per-record cache
+
+    print(f"find over {rows} rows, CPU ms (best of 5), orjson={'yes' if cosmoweb3db.orjson else 'no'}")
+    print(f"  jsonable_encoder + json.dumps  {cpu_ms(default_path):9.1f}")
+    print(f"  dumps() over the result list   {cpu_ms(fast_uncached):9.1f}")
+    print(f"  cached records, unfiltered     {cpu_ms(cached(None)):9.1f}")
+    print(f"  cached records, filtered       {cpu_ms(cached(query)):9.1f}")
+    loop.close()
+
+if __name__ == "__main__":
+    main()
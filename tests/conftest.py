@@ -0,0 +1,5 @@
+import os
+import sys
+
+# api/ modules import each other as top-level modules (python api/<service>.py)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "api"))
@@ -0,0 +1,55 @@
+import numpy as np
+
+from analytics import Snapshot, export_collection
+
+def _payouts(n, network="shopify", hour=0):
+    return [{"amount": 1.0, "network": network, "timestamp": f"2026-10-19T{hour:02d}:{i % 60:02d}:00"} for i in range(n)]
+
+def test_export_is_incremental_within_an_epoch(tmp_path):
+    records = _payouts(5)
+    assert export_collection(records, "payouts", tmp_path, "epoch-1") == 5
+    assert export_collection(records, "payouts", tmp_path, "epoch-1") == 0
+    records += _payouts(3)
+    assert export_collection(records, "payouts", tmp_path, "epoch-1") == 3
+    assert Snapshot(tmp_path).rows("payouts") == 8
+
+def test_restart_exports_every_record_of_the_new_epoch(tmp_path):
+    export_collection(_payouts(5), "payouts", tmp_path, "epoch-1")
+    # Process restarted: the in-memory collection starts empty again
+    assert export_collection(_payouts(7, network="amazon"), "payouts", tmp_path, "epoch-2") == 7
+
+    snapshot = Snapshot(tmp_path)
+    assert snapshot.rows("payouts") == 12
+    groups = snapshot.group_by("payouts", "network", "amount")
+    assert groups["shopify"]["count"] == 5
+    assert groups["amazon"]["count"] == 7
+
+def test_shrunk_collection_restarts_the_cursor(tmp_path):
+    export_collection(_payouts(5), "payouts", tmp_path, "epoch-1")
+    assert export_collection(_payouts(2), "payouts", tmp_path, "epoch-1") == 2
+    assert Snapshot(tmp_path).rows("payouts") == 7
+
+def test_time_windows_and_memory_mapped_columns(tmp_path):
+    export_collection(_payouts(4, hour=0) + _payouts(6, hour=2), "payouts", tmp_path, "epoch-1", batch_size=3)
+    snapshot = Snapshot(tmp_path)
+
+    windows = snapshot.time_windows("payouts", "amount", window="1h")
+    assert [(w["window_start"][:13], w["count"]) for w in windows] == [("2026-10-19T00", 4), ("2026-10-19T02", 6)]
+    amounts, = next(snapshot.iter_columns("payouts", "amount"))
+    assert isinstance(amounts, np.memmap)
+
+def test_bools_and_wide_integers_are_not_numbers(tmp_path):
+    wei = 12345678901234567890123
+    records = [{"amount": 1, "ok": True, "wei": wei}, {"amount": 2, "ok": False, "wei": 1}]
+    export_collection(records, "payouts", tmp_path, "epoch-1")
+    # Later batches keep the first batch's kinds; values that do not fit become missing
+    records.append({"amount": True, "ok": 3, "wei": 2})
+    export_collection(records, "payouts", tmp_path, "epoch-1")
+
+    snapshot = Snapshot(tmp_path)
+    schema = snapshot.manifest["collections"]["payouts"]["schema"]
+    assert schema == {"amount": "number", "ok": "string", "wei": "string"}
+    assert snapshot.column("payouts", "ok").tolist() == ["True", "False", "3"]
+    assert snapshot.column("payouts", "wei").tolist() == [str(wei), "1", "2"]
+    amounts = snapshot.column("payouts", "amount")
+    assert amounts[:2].tolist() == [1.0, 2.0] and np.isnan(amounts[2])
@@ -0,0 +1,179 @@
+import hashlib
+from types import SimpleNamespace
+
+import pytest
+from hexbytes import HexBytes
+from web3 import Web3
+
+import cosmoweb3db
+from cosmoweb3db import TRANSFER_TOPIC, TransferIndexer
+
+TOKEN = Web3.to_checksum_address("0x" + "22" * 20)
+WALLET = Web3.to_checksum_address("0x" + "11" * 20)
+OTHER = Web3.to_checksum_address("0x" + "33" * 20)
+BASELINE = 1000
+
+def _topic(address):
+    return "0x" + "0" * 24 + address[2:].lower()
+
+class FakeEth:
+    """Just enough of w3.eth for TransferIndexer: blocks, Transfer logs and a getLogs range cap"""
+
+    def __init__(self, max_range=None):
+        self.hashes = []   # Block number -> hash
+        self.logs = {}     # Block number -> logs
+        self.max_range = max_range
+        self.rejected = 0
+        self.get_logs_calls = 0
+        self.after_get_logs = None  # Hook, e.g. a reorg landing mid-fetch
+
+    @property
+    def block_number(self):
+        return len(self.hashes) - 1
+
+    def mine(self, *transfers, fork="a"):
+        """Append a block holding (from, to, value) transfers of TOKEN"""
+        number = len(self.hashes)
+        block_hash = HexBytes(hashlib.sha256(f"{fork}:{number}".encode()).digest())
+        self.hashes.append(block_hash)
+        self.logs[number] = [
+            {
+                "address": TOKEN,
+                "blockNumber": number,
+                "blockHash": block_hash,
+                "logIndex": i,
+                "transactionHash": HexBytes(hashlib.sha256(f"{fork}:{number}:{i}".encode()).digest()),
+                "topics": [HexBytes(TRANSFER_TOPIC), HexBytes(_topic(src)), HexBytes(_topic(dst))],
+                "data": HexBytes(value.to_bytes(32, "big"))
+            }
+            for i, (src, dst, value) in enumerate(transfers)
+        ]
+
+    def reorg(self, from_block):
+        """Drop blocks from `from_block` on; mine() the replacement fork"""
+        for number in range(from_block, len(self.hashes)):
+            del self.logs[number]
+        del self.hashes[from_block:]
+
+    def get_block(self, number):
+        return {"hash": self.hashes[number]}
+
+    def get_logs(self, params):
+        if self.max_range and params["toBlock"] - params["fromBlock"] + 1 > self.max_range:
+            self.rejected += 1
+            raise ValueError("block range too large")
+        matches = [
+            log
+            for number in range(params["fromBlock"], params["toBlock"] + 1)
+            for log in self.logs[number]
+            if log["address"] == params["address"]
+            and all(want is None or Web3.to_hex(got) == want for got, want in zip(log["topics"], params["topics"]))
+        ]
+        self.get_logs_calls += 1
+        if self.after_get_logs:
+            self.after_get_logs()
+        return matches
+
+@pytest.fixture
+def eth(monkeypatch):
+    monkeypatch.setattr(cosmoweb3db, "usdt_balance_at", lambda address, block="latest": BASELINE)
+    chain = FakeEth(max_range=4)
+    chain.mine()  # Block 0: the indexer starts at block 1
+    return chain
+
+def _indexer(eth, tmp_path):
+    return TransferIndexer(SimpleNamespace(eth=eth), TOKEN, WALLET, str(tmp_path / "index.json"),
+                           start_block=1, reorg_depth=5, min_chunk=2, max_chunk=8)
+
+def _assert_canonical(indexer, eth):
+    for event in indexer.events:
+        assert event["block_hash"] == Web3.to_hex(eth.hashes[event["block"]])
+
+def test_catches_up_across_chunks(eth, tmp_path):
+    for number in range(1, 30):
+        if number % 3 == 0:
+            eth.mine((OTHER, WALLET, 10))
+        elif number % 7 == 0:
+            eth.mine((WALLET, OTHER, 1))
+        else:
+            eth.mine((OTHER, OTHER, 5))  # Same token, other wallets: not indexed
+    indexer = _indexer(eth, tmp_path)
+    indexer.sync_once()
+
+    assert indexer.synced and indexer.checkpoint == 29
+    assert eth.rejected > 0  # Oversized ranges were shrunk, not fatal
+    incoming = [n for n in range(1, 30) if n % 3 == 0]
+    outgoing = [n for n in range(1, 30) if n % 3 and n % 7 == 0]
+    assert [e["block"] for e in indexer.events] == sorted(incoming + outgoing)
+    assert indexer.balance == BASELINE + 10 * len(incoming) - len(outgoing)
+
+def test_self_transfer_counted_once(eth, tmp_path):
+    eth.mine((WALLET, WALLET, 50))
+    eth.mine((OTHER, WALLET, 7))
+    indexer = _indexer(eth, tmp_path)
+    indexer.sync_once()
+
+    assert len(indexer.events) == 2
+    assert indexer.balance == BASELINE + 7
+
+def test_fork_replaces_tip_blocks(eth, tmp_path):
+    for number in range(1, 21):
+        eth.mine((OTHER, WALLET, number))
+    indexer = _indexer(eth, tmp_path)
+    indexer.sync_once()
+    assert indexer.balance == BASELINE + sum(range(1, 21))
+
+    eth.reorg(18)
+    eth.mine((WALLET, OTHER, 100), fork="b")  # 18
+    eth.mine(fork="b")                        # 19
+    eth.mine((OTHER, WALLET, 3), fork="b")    # 20
+    eth.mine((OTHER, WALLET, 4), fork="b")    # 21
+    indexer.sync_once()
+
+    assert indexer.checkpoint == 21
+    assert [e["block"] for e in indexer.events] == [*range(1, 19), 20, 21]
+    assert indexer.balance == BASELINE + sum(range(1, 18)) - 100 + 3 + 4
+    _assert_canonical(indexer, eth)
+
+def test_reorg_during_fetch_is_retried(eth, tmp_path):
+    for number in range(1, 5):
+        eth.mine((OTHER, WALLET, 1))
+    indexer = _indexer(eth, tmp_path)
+    indexer.sync_once()
+
+    eth.mine((OTHER, WALLET, 1000))  # 5, about to be orphaned
+    calls = eth.get_logs_calls
+
+    def fork():
+        # After both filters of the first fetch: the logs are from the old
+        # tip, any hash read afterwards is the new one
+        if eth.get_logs_calls == calls + 2:
+            eth.reorg(5)
+            eth.mine((OTHER, WALLET, 2), fork="b")
+
+    eth.after_get_logs = fork
+    indexer.sync_once()
+
+    assert indexer.checkpoint == 5
+    assert indexer.balance == BASELINE + 4 + 2
+    _assert_canonical(indexer, eth)
+
+def test_reload_resumes_from_state_file(eth, tmp_path, monkeypatch):
+    for number in range(1, 10):
+        eth.mine((OTHER, WALLET, number))
+    indexer = _indexer(eth, tmp_path)
+    indexer.sync_once()
+
+    resumed = _indexer(eth, tmp_path)
+    resumed.load()
+    assert resumed.view == indexer.view
+    assert resumed.block_hashes == indexer.block_hashes
+
+    def no_bootstrap(address, block="latest"):
+        raise AssertionError("a resumed index must not re-read the baseline")
+
+    monkeypatch.setattr(cosmoweb3db, "usdt_balance_at", no_bootstrap)
+    eth.mine((WALLET, OTHER, 5))
+    resumed.sync_once()
+    assert resumed.checkpoint == 10
+    assert resumed.balance == BASELINE + sum(range(1, 10)) - 5
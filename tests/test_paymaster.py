@@ -0,0 +1,101 @@
+import asyncio
+import time
+
+from aiohttp import web
+
+from paymaster import CircuitBreaker, PaymasterMonitor
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+async def _stub_server(routes):
+    """Serve {path: handler} on an ephemeral local port; returns (runner, base url)"""
+    app = web.Application()
+    for path, handler in routes.items():
+        app.router.add_get(path, handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = runner.addresses[0][1]
+    return runner, f"http://127.0.0.1:{port}"
+
+def test_breaker_backoff_doubles_and_caps():
+    clock = FakeClock()
+    breaker = CircuitBreaker(threshold=2, base_backoff=5, max_backoff=12, clock=clock)
+    breaker.failure()
+    assert breaker.state == "closed"
+    breaker.failure()
+    assert breaker.state == "open" and breaker.open_until == clock.now + 5
+    breaker.failure()
+    assert breaker.open_until == clock.now + 10
+    breaker.failure()
+    assert breaker.open_until == clock.now + 12
+    clock.now += 12
+    assert breaker.state == "half_open" and breaker.allow()
+    breaker.success()
+    assert breaker.state == "closed"
+
+def test_endpoints_are_probed_concurrently():
+    async def slow(request):
+        await asyncio.sleep(0.3)
+        return web.Response(text="ok")
+
+    async def scenario():
+        runner, base = await _stub_server({"/a": slow, "/b": slow})
+        try:
+            monitor = PaymasterMonitor({"primary": f"{base}/a", "backup": f"{base}/b"}, timeout=2)
+            started = time.monotonic()
+            assert await monitor.probe_all()
+            return time.monotonic() - started
+        finally:
+            await runner.cleanup()
+
+    # Sequential probing would take at least 0.6 s
+    assert asyncio.run(scenario()) < 0.55
+
+def test_breaker_opens_recovers_half_open_and_results_go_stale():
+    clock = FakeClock()
+    state = {"status": 500, "hits": 0}
+
+    async def health(request):
+        state["hits"] += 1
+        return web.Response(status=state["status"])
+
+    async def scenario():
+        runner, base = await _stub_server({"/health": health})
+        try:
+            monitor = PaymasterMonitor({"primary": f"{base}/health"}, timeout=2, max_staleness=30,
+                                       threshold=2, base_backoff=5, clock=clock)
+            breaker = monitor.breakers["primary"]
+
+            assert not await monitor.probe_all()
+            assert breaker.state == "closed"
+            assert not await monitor.probe_all()
+            assert breaker.state == "open"
+
+            # Open: the endpoint is not probed at all
+            assert not await monitor.probe_all()
+            assert state["hits"] == 2
+
+            # Backoff elapsed and the endpoint is back: one half-open probe closes it
+            clock.now += 5
+            state["status"] = 200
+            assert breaker.state == "half_open"
+            assert await monitor.probe_all()
+            assert breaker.state == "closed" and state["hits"] == 3
+            assert monitor.status()["endpoints"][0]["healthy"]
+
+            # Cached result expires once it is older than max_staleness
+            clock.now += 30
+            assert monitor.healthy()
+            clock.now += 1
+            assert not monitor.healthy()
+        finally:
+            await runner.cleanup()
+
+    asyncio.run(scenario())